@@ -1,16 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from typing import Annotated, Literal
 
-from app.services.inpaint_service import inpaint_image
-from app.utils.image_utils import decode_base64_image, encode_image_to_base64
+from fastapi import APIRouter, File, Form, HTTPException, Response, UploadFile
+from pydantic import BaseModel, BeforeValidator
+
+from app.services.inpaint_service import inpaint_image_batched
+from app.utils.image_utils import (
+    DEFAULT_OUTPUT_FORMAT,
+    OUTPUT_FORMATS,
+    decode_base64_image,
+    decode_image_bytes,
+    encode_image_to_base64,
+    encode_image_to_bytes,
+    image_mime_type,
+)
 
 
 router = APIRouter()
 
+# One of the OUTPUT_FORMATS keys, accepted in any case
+OutputFormat = Annotated[
+    Literal[tuple(OUTPUT_FORMATS)],
+    BeforeValidator(lambda value: value.upper() if isinstance(value, str) else value),
+]
+
 
 class InpaintRequest(BaseModel):
     image: str  # Base64 encoded image (data:image/png;base64,...)
     mask: str   # Base64 encoded mask (data:image/png;base64,...)
+    format: OutputFormat = DEFAULT_OUTPUT_FORMAT  # Encoding of the result image
 
 
 class InpaintResponse(BaseModel):
@@ -31,10 +48,10 @@ async def inpaint(request: InpaintRequest):
         mask = decode_base64_image(request.mask)
 
         # Perform inpainting
-        result = inpaint_image(image, mask)
+        result = await inpaint_image_batched(image, mask)
 
         # Encode result to base64
-        result_base64 = encode_image_to_base64(result)
+        result_base64 = encode_image_to_base64(result, request.format)
 
         return InpaintResponse(result=result_base64)
 
@@ -42,3 +59,31 @@ async def inpaint(request: InpaintRequest):
         raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Inpainting failed: {str(e)}")
+
+
+@router.post("/inpaint_binary", response_class=Response)
+async def inpaint_binary(
+    image: UploadFile = File(...),
+    mask: UploadFile = File(...),
+    format: Annotated[OutputFormat, Form()] = DEFAULT_OUTPUT_FORMAT,
+):
+    """
+    Perform image inpainting on multipart file uploads.
+
+    Same as /inpaint, but the image and mask are sent as raw image files
+    and the result is returned as a raw image body, avoiding the base64 overhead.
+    """
+    try:
+        # Decode uploaded images
+        input_image = decode_image_bytes(await image.read())
+        input_mask = decode_image_bytes(await mask.read())
+
+        # Perform inpainting
+        result = await inpaint_image_batched(input_image, input_mask)
+
+        return Response(content=encode_image_to_bytes(result, format), media_type=image_mime_type(format))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Inpainting failed: {str(e)}")
@@ -1,7 +1,15 @@
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import router as api_router
+# Pin the OpenMP/MKL thread pools before torch is imported (via the API routes)
+_num_threads = str(max(1, (os.cpu_count() or 2) // 2))
+os.environ.setdefault("OMP_NUM_THREADS", _num_threads)
+os.environ.setdefault("MKL_NUM_THREADS", _num_threads)
+
+from app.api.routes import router as api_router  # noqa: E402
+from app.services.inpaint_service import get_batcher, warm_up_inpainter  # noqa: E402
 
 app = FastAPI(
     title="Abbaas Painter API",
@@ -29,6 +37,24 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+def load_model():
+    """Load and warm up the LaMa model before serving traffic."""
+    warm_up_inpainter()
+
+
+@app.on_event("startup")
+async def start_batcher():
+    """Start the request batcher on the server's event loop."""
+    get_batcher().start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    """Stop the request batcher."""
+    await get_batcher().stop()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -1,13 +1,95 @@
+import asyncio
+import hashlib
+import os
+import threading
+from pathlib import Path
+
 import numpy as np
 import torch
+import torch.nn.functional as F
 from huggingface_hub import hf_hub_download
+from huggingface_hub.utils import LocalEntryNotFoundError
 from PIL import Image
 
+from app.utils.image_utils import image_to_numpy, mask_to_numpy, numpy_to_image
+
+MODEL_REPO_ID = "fashn-ai/LaMa"
+MODEL_FILENAME = "big-lama.pt"
+
+# Longest edge the model runs at; larger images are downscaled for inference
+# and the result is upscaled back before compositing
+MAX_INFERENCE_SIZE = 2048
+
+# The model needs input dimensions that are multiples of this
+PAD_MULTIPLE = 8
+
+# Concurrent requests are micro-batched into one forward pass: the batcher
+# waits up to BATCH_TIMEOUT_MS to collect up to MAX_BATCH_SIZE requests and
+# batches those whose sizes round up to the same BATCH_BUCKET_MULTIPLE
+# (LAMA_MAX_BATCH_SIZE=1 disables batching)
+MAX_BATCH_SIZE = max(1, int(os.environ.get("LAMA_MAX_BATCH_SIZE", "4")))
+BATCH_TIMEOUT_MS = float(os.environ.get("LAMA_BATCH_TIMEOUT_MS", "20"))
+BATCH_BUCKET_MULTIPLE = 64
+
+# A batch holds at most this many pixels, so batching never needs more memory
+# than one maximum-size image; large requests run on their own
+MAX_BATCH_PIXELS = int(os.environ.get("LAMA_MAX_BATCH_PIXELS", MAX_INFERENCE_SIZE * MAX_INFERENCE_SIZE))
+
+# Opt-in bfloat16 autocast for CPUs with AVX-512-BF16 / AMX (LAMA_BF16=1)
+USE_BF16 = os.environ.get("LAMA_BF16", "0") == "1"
+
+# Use half the cores for intra-op work so a shared host is not oversubscribed;
+# app.main exports the same value as OMP_NUM_THREADS before torch is imported
+NUM_THREADS = int(os.environ.get("OMP_NUM_THREADS", max(1, (os.cpu_count() or 2) // 2)))
+torch.set_num_threads(NUM_THREADS)
+torch.set_num_interop_threads(1)
+
+
+def _file_digest(path: str | Path) -> str:
+    """Compute the SHA-256 hex digest of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _model_digest(path: Path) -> str:
+    """
+    Get the content hash of a downloaded model file.
+
+    The HuggingFace Hub cache stores files as blobs named by their hash and
+    symlinks them into snapshots, so the hash is read from the link target
+    instead of re-hashing the file on every startup.
+    """
+    resolved = path.resolve()
+    if resolved != path.absolute() and resolved.parent.name == "blobs":
+        return resolved.name
+    return _file_digest(path)
+
+
+def _padded_size(height: int, width: int, multiple: int) -> tuple[int, int]:
+    """Round image dimensions up to the next multiple."""
+    return -(-height // multiple) * multiple, -(-width // multiple) * multiple
+
+
+def _mask_is_empty(mask: np.ndarray) -> bool:
+    """Check whether a mask has no pixels that binarize to white (above 127)."""
+    return mask.size == 0 or mask.max() <= 127
+
+
+def _save_model(model: torch.jit.ScriptModule, path: Path) -> None:
+    """Save a TorchScript module atomically so concurrent workers never read a partial file."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    torch.jit.save(model, str(tmp_path))
+    os.replace(tmp_path, path)
+
 
 class LaMaInpainter:
     """
     LaMa (Large Mask Inpainting) model wrapper for CPU inference.
-    Downloads the model from HuggingFace Hub on first use.
+    The model is downloaded from HuggingFace Hub and loaded at application
+    startup by warm_up_inpainter.
     """
 
     _instance = None
@@ -24,34 +106,226 @@ class LaMaInpainter:
         self._initialized = True
         self.device = torch.device("cpu")
         self.model = None
+        self._use_bf16 = False
+        self._image_buf: torch.Tensor | None = None
+        self._mask_buf: torch.Tensor | None = None
+        self._buffer_lock = threading.Lock()
 
     def _load_model(self):
-        """Lazily load the LaMa model."""
+        """Load, optimize and warm up the LaMa model unless it is already loaded."""
         if self.model is not None:
             return
 
-        print("Downloading LaMa model from HuggingFace Hub...")
-        model_path = hf_hub_download(
-            repo_id="fashn-ai/LaMa",
-            filename="big-lama.pt"
+        model_path = self._download_model()
+
+        # The frozen module is cached next to the weights so restarts skip freezing
+        model_file = Path(model_path)
+        cache_path = model_file.with_name(
+            f"{model_file.stem}.{_model_digest(model_file)[:16]}.torch-{torch.__version__}.frozen.pt"
         )
-        print(f"Loading model from {model_path}...")
-        self.model = torch.jit.load(model_path, map_location=self.device)
-        self.model.eval()
+
+        if cache_path.exists():
+            print(f"Loading cached model from {cache_path}...")
+            self.model = torch.jit.load(str(cache_path), map_location=self.device)
+        else:
+            print(f"Loading model from {model_path}...")
+            self.model = torch.jit.load(model_path, map_location=self.device)
+            self.model.eval()
+            # Fold BatchNorm into convs and inline parameters for faster inference
+            self.model = torch.jit.freeze(self.model)
+            try:
+                _save_model(self.model, cache_path)
+            except OSError as e:
+                print(f"Could not cache model at {cache_path}: {e}")
+
+        # Let the oneDNN Graph fuser pick up conv/elementwise patterns
+        torch.jit.enable_onednn_fusion(True)
+
+        self._use_bf16 = USE_BF16 and self._runs_in_bf16()
+        if not self._use_bf16:
+            # Not cached: the result may hold prepacked oneDNN weights that are not
+            # serializable. Skipped for bfloat16 since the prepacked fp32 convs
+            # bypass autocast.
+            self.model = torch.jit.optimize_for_inference(self.model)
+
+        self._warm_up()
         print("Model loaded successfully!")
 
-    def _pad_to_multiple(self, img: np.ndarray, multiple: int = 8) -> tuple[np.ndarray, tuple[int, int]]:
-        """Pad image dimensions to be multiples of a given number."""
-        h, w = img.shape[:2]
-        pad_h = (multiple - h % multiple) % multiple
-        pad_w = (multiple - w % multiple) % multiple
+    def _download_model(self) -> str:
+        """Get the local path of the LaMa weights, downloading them only if not cached."""
+        try:
+            # Skip the Hub round-trip when the weights are already cached
+            return hf_hub_download(repo_id=MODEL_REPO_ID, filename=MODEL_FILENAME, local_files_only=True)
+        except LocalEntryNotFoundError:
+            print("Downloading LaMa model from HuggingFace Hub...")
+            return hf_hub_download(repo_id=MODEL_REPO_ID, filename=MODEL_FILENAME)
+
+    def _autocast(self) -> torch.autocast:
+        """Autocast context for inference (a no-op unless bfloat16 is enabled)."""
+        return torch.autocast(device_type=self.device.type, dtype=torch.bfloat16, enabled=self._use_bf16)
+
+    def _runs_in_bf16(self) -> bool:
+        """Check that the model actually computes in bfloat16 under autocast."""
+        image_tensor = torch.zeros(1, 3, 64, 64, device=self.device)
+        mask_tensor = torch.zeros(1, 1, 64, 64, device=self.device)
+        try:
+            with torch.inference_mode(), torch.autocast(device_type=self.device.type, dtype=torch.bfloat16):
+                result = self.model(image_tensor, mask_tensor)
+        except RuntimeError as e:
+            print(f"bfloat16 inference unavailable, falling back to float32: {e}")
+            return False
+        if result.dtype != torch.bfloat16:
+            print("Model does not run in bfloat16 under autocast, falling back to float32")
+            return False
+        return True
+
+    def _warm_up(self, size: int = 256):
+        """Run dummy forward passes so JIT specialization happens off the request path."""
+        image_tensor = torch.zeros(1, 3, size, size, device=self.device)
+        image_tensor = image_tensor.contiguous(memory_format=torch.channels_last)
+        mask_tensor = torch.zeros(1, 1, size, size, device=self.device)
+        # The profiling executor specializes the graph on the second run
+        with torch.inference_mode(), self._autocast():
+            for _ in range(2):
+                self.model(image_tensor, mask_tensor)
+
+    def _input_tensors(self, batch: int, height: int, width: int) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get (B, 3, H, W) image and (B, 1, H, W) mask tensors backed by persistent buffers.
 
-        if len(img.shape) == 3:
-            padded = np.pad(img, ((0, pad_h), (0, pad_w), (0, 0)), mode="reflect")
+        The buffers grow to fit the largest input seen so far and are reused
+        across requests. The image tensor is a channels-last view. Callers
+        must hold _buffer_lock while using the tensors.
+        """
+        numel = batch * height * width
+        if self._image_buf is None or self._image_buf.numel() < 3 * numel:
+            self._image_buf = torch.empty(3 * numel, dtype=torch.float32, device=self.device)
+            self._mask_buf = torch.empty(numel, dtype=torch.float32, device=self.device)
+
+        image_tensor = self._image_buf[:3 * numel].view(batch, height, width, 3).permute(0, 3, 1, 2)
+        mask_tensor = self._mask_buf[:numel].view(batch, 1, height, width)
+        return image_tensor, mask_tensor
+
+    def _dilate_mask(self, mask: np.ndarray, iterations: int = 2) -> np.ndarray:
+        """
+        Dilate a binary (0/1) mask with a 3x3 cross structuring element.
+
+        Equivalent to scipy.ndimage.binary_dilation, computed as the max of a
+        vertical and a horizontal 3-pixel max-pool per iteration.
+        """
+        with torch.inference_mode():
+            m = torch.from_numpy(mask).to(torch.float32).unsqueeze(0).unsqueeze(0)
+            for _ in range(iterations):
+                m = torch.maximum(
+                    F.max_pool2d(m, (3, 1), stride=1, padding=(1, 0)),
+                    F.max_pool2d(m, (1, 3), stride=1, padding=(0, 1)),
+                )
+            return m[0, 0].numpy().astype(np.uint8)
+
+    def _resize(self, img: np.ndarray, size: tuple[int, int], resample: int) -> np.ndarray:
+        """Resize an image array to (width, height) with PIL."""
+        return np.asarray(Image.fromarray(img).resize(size, resample))
+
+    def _pad_into(self, dst: np.ndarray, src: np.ndarray) -> None:
+        """
+        Copy an image into the top-left of a larger array and reflect-pad the rest.
+
+        Equivalent to np.pad(mode="reflect") on the bottom/right edges, but
+        writes straight into dst (converting dtype on the way) without
+        allocating a padded copy.
+        """
+        h, w = src.shape[:2]
+        pad_h = dst.shape[0] - h
+        pad_w = dst.shape[1] - w
+
+        if pad_h >= h - 1 or pad_w >= w - 1:
+            # Tiny images need repeated reflection, which np.pad handles
+            pad_width = ((0, pad_h), (0, pad_w)) + ((0, 0),) * (src.ndim - 2)
+            dst[...] = np.pad(src, pad_width, mode="reflect")
+            return
+
+        dst[:h, :w] = src
+        if pad_h:
+            dst[h:, :w] = dst[h - 2:h - 2 - pad_h:-1, :w]
+        if pad_w:
+            dst[:, w:] = dst[:, w - 2:w - 2 - pad_w:-1]
+
+    def _prepare(self, image: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Binarize and dilate the mask and downscale oversized inputs for the model.
+
+        Returns:
+            (model_image, model_mask, mask_dilated), where mask_dilated is the
+            full-resolution 0/1 mask used for compositing
+        """
+        # Binarize mask to 0/1 (threshold at 127); viewing the bools as uint8 avoids a copy
+        mask_binary = (mask > 127).view(np.uint8)
+
+        # Dilate mask slightly for better blending at edges
+        mask_dilated = self._dilate_mask(mask_binary, iterations=2)
+
+        # Downscale oversized images for inference; compositing stays at full
+        # resolution so pixels outside the mask are untouched
+        orig_h, orig_w = image.shape[:2]
+        scale = MAX_INFERENCE_SIZE / max(orig_h, orig_w)
+        if scale < 1:
+            size = (max(1, round(orig_w * scale)), max(1, round(orig_h * scale)))
+            model_image = self._resize(image, size, Image.BOX)
+            # Any coverage counts as masked so thin strokes survive downscaling;
+            # the mask is scaled to 0/255 so BOX averaging cannot round it away
+            model_mask = (self._resize(mask_dilated * 255, size, Image.BOX) > 0).view(np.uint8)
         else:
-            padded = np.pad(img, ((0, pad_h), (0, pad_w)), mode="reflect")
+            model_image, model_mask = image, mask_dilated
+
+        return model_image, model_mask, mask_dilated
+
+    def _run_batch(
+        self, inputs: list[tuple[np.ndarray, np.ndarray]], padded_h: int, padded_w: int
+    ) -> list[np.ndarray]:
+        """
+        Run the model on a batch of prepared (model_image, model_mask) pairs.
+
+        Every pair is padded to (padded_h, padded_w), which must be multiples
+        of PAD_MULTIPLE at least as large as each image. Returns the model
+        output for each pair, cropped back to that pair's size.
+        """
+        # The input buffers are shared, so only one batch may fill and run them at a time
+        with self._buffer_lock:
+            # Pad to the batch size, converting to float straight into the
+            # reusable input buffers. The image stays in NHWC layout so oneDNN
+            # picks channels-last conv kernels. The mask is already 0/1.
+            image_tensor, mask_tensor = self._input_tensors(len(inputs), padded_h, padded_w)
+            for i, (model_image, model_mask) in enumerate(inputs):
+                self._pad_into(image_tensor[i].permute(1, 2, 0).numpy(), model_image)
+                self._pad_into(mask_tensor[i, 0].numpy(), model_mask)
+
+            # Normalize to [0, 1]
+            image_tensor.mul_(1.0 / 255.0)
+
+            # Zero out masked regions in input image (LaMa expects this)
+            image_tensor.masked_fill_(mask_tensor > 0, 0)
+
+            # Run inference
+            with torch.inference_mode(), self._autocast():
+                result = self.model(image_tensor, mask_tensor)
+
+        # Convert back to numpy
+        result = result.permute(0, 2, 3, 1).float().cpu().numpy()
+        result = np.clip(result * 255, 0, 255).astype(np.uint8)
+
+        # Crop away the padding
+        return [result[i, :img.shape[0], :img.shape[1]] for i, (img, _) in enumerate(inputs)]
 
-        return padded, (h, w)
+    def _composite(self, image: np.ndarray, mask_dilated: np.ndarray, result: np.ndarray) -> np.ndarray:
+        """Paste the model output into the masked areas of the original image."""
+        # Restore the original size if the image was downscaled for inference
+        orig_h, orig_w = image.shape[:2]
+        if result.shape[:2] != (orig_h, orig_w):
+            result = self._resize(result, (orig_w, orig_h), Image.BICUBIC)
+
+        # Composite: use inpainted result in masked areas, original elsewhere.
+        # The mask is binary, so this is a per-pixel select that stays in uint8.
+        return np.where(mask_dilated[..., None] > 0, result, image)
 
     def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
         """
@@ -65,55 +339,135 @@ class LaMaInpainter:
         Returns:
             Inpainted image as numpy array (H, W, 3), uint8
         """
-        self._load_model()
+        # Nothing to inpaint, so skip the model entirely
+        if _mask_is_empty(mask):
+            return image.copy()
 
-        # Store original image for compositing
-        original_image = image.copy()
-
-        # Binarize mask (threshold at 127)
-        mask_binary = (mask > 127).astype(np.uint8) * 255
-
-        # Dilate mask slightly for better blending at edges
-        from scipy import ndimage
-        mask_dilated = ndimage.binary_dilation(mask_binary > 0, iterations=2).astype(np.uint8) * 255
-
-        # Pad to multiple of 8 for the model
-        image_padded, (orig_h, orig_w) = self._pad_to_multiple(image, 8)
-        mask_padded, _ = self._pad_to_multiple(mask_dilated, 8)
+        self._load_model()
 
-        # Normalize image to [0, 1] and convert to tensor
-        image_tensor = torch.from_numpy(image_padded).float() / 255.0
-        image_tensor = image_tensor.permute(2, 0, 1).unsqueeze(0)  # (1, 3, H, W)
+        model_image, model_mask, mask_dilated = self._prepare(image, mask)
+        padded_h, padded_w = _padded_size(*model_image.shape[:2], PAD_MULTIPLE)
+        [result] = self._run_batch([(model_image, model_mask)], padded_h, padded_w)
+        return self._composite(image, mask_dilated, result)
 
-        # Normalize mask to [0, 1] and convert to tensor
-        mask_tensor = torch.from_numpy(mask_padded).float() / 255.0
-        mask_tensor = mask_tensor.unsqueeze(0).unsqueeze(0)  # (1, 1, H, W)
 
-        # Zero out masked regions in input image (LaMa expects this)
-        image_tensor = image_tensor * (1 - mask_tensor)
+class InpaintBatcher:
+    """
+    Micro-batches concurrent inpainting requests into shared model calls.
 
-        # Move to device
-        image_tensor = image_tensor.to(self.device)
-        mask_tensor = mask_tensor.to(self.device)
+    A single background task collects queued requests, groups them by size
+    and runs each group as one batch in a worker thread, so model calls never
+    overlap and the event loop stays free while the model runs. The app starts
+    it on startup and stops it on shutdown.
+    """
 
-        # Run inference
-        with torch.no_grad():
-            result = self.model(image_tensor, mask_tensor)
+    def __init__(self, inpainter: LaMaInpainter):
+        self._inpainter = inpainter
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
 
-        # Convert back to numpy
-        result = result.squeeze(0).permute(1, 2, 0).cpu().numpy()
-        result = np.clip(result * 255, 0, 255).astype(np.uint8)
+    def start(self):
+        """
+        Start the consumer task on the running event loop.
 
-        # Crop to original size
-        result = result[:orig_h, :orig_w, :]
+        Does nothing if it is already running there; a consumer that exited
+        or belongs to another (e.g. closed) loop is replaced.
+        """
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
 
-        # Composite: use inpainted result in masked areas, original elsewhere
-        mask_float = mask_dilated[:orig_h, :orig_w].astype(np.float32) / 255.0
-        mask_3ch = np.stack([mask_float] * 3, axis=-1)
+    async def stop(self):
+        """Stop the consumer task and cancel any requests still waiting on it."""
+        if self._task is None:
+            return
+        task, queue, loop = self._task, self._queue, self._loop
+        self._task = self._queue = self._loop = None
+        if loop is not asyncio.get_running_loop():
+            # The consumer's loop is already gone, so there is nothing left to wait for
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        while not queue.empty():
+            _, _, future = queue.get_nowait()
+            future.cancel()
+
+    async def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Async counterpart of LaMaInpainter.inpaint that shares model calls with concurrent requests."""
+        if _mask_is_empty(mask):
+            return image.copy()
+
+        self.start()
+
+        model_image, model_mask, mask_dilated = await asyncio.to_thread(self._inpainter._prepare, image, mask)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model_image, model_mask, future))
+        result = await future
+        return await asyncio.to_thread(self._inpainter._composite, image, mask_dilated, result)
+
+    async def _run(self):
+        """Collect queued requests and dispatch them in size-bucketed batches."""
+        while True:
+            pending = [await self._queue.get()]
+            try:
+                # Give concurrent requests a moment to arrive unless a batch is already waiting
+                if self._queue.qsize() < MAX_BATCH_SIZE - 1:
+                    await asyncio.sleep(BATCH_TIMEOUT_MS / 1000)
+                while len(pending) < MAX_BATCH_SIZE and not self._queue.empty():
+                    pending.append(self._queue.get_nowait())
+
+                # Group by size bucket, starting a new batch when the open
+                # one for that bucket would exceed the pixel budget
+                batches: list[list] = []
+                open_batches: dict[tuple[int, int], list] = {}
+                for item in pending:
+                    bucket = _padded_size(*item[0].shape[:2], BATCH_BUCKET_MULTIPLE)
+                    batch = open_batches.get(bucket)
+                    if batch is None or (len(batch) + 1) * bucket[0] * bucket[1] > MAX_BATCH_PIXELS:
+                        batch = open_batches[bucket] = []
+                        batches.append(batch)
+                    batch.append(item)
+
+                for batch in batches:
+                    await self._run_group(batch)
+            finally:
+                # Never leave a caller waiting if the consumer is cancelled mid-batch
+                for _, _, future in pending:
+                    future.cancel()
+
+    async def _run_group(self, group: list[tuple[np.ndarray, np.ndarray, asyncio.Future]]):
+        """Run one batch and hand each caller its result (or the error)."""
+        # Pad to the largest member rather than the bucket so a lone request
+        # costs no more than an unbatched one
+        padded = [_padded_size(*model_image.shape[:2], PAD_MULTIPLE) for model_image, _, _ in group]
+        padded_h = max(h for h, _ in padded)
+        padded_w = max(w for _, w in padded)
+        inputs = [(model_image, model_mask) for model_image, model_mask, _ in group]
+
+        try:
+            results = await asyncio.to_thread(self._infer, inputs, padded_h, padded_w)
+        except Exception as e:
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
 
-        final_result = (result * mask_3ch + original_image * (1 - mask_3ch)).astype(np.uint8)
+        for (_, _, future), result in zip(group, results):
+            # The caller may have gone away (e.g. client disconnect)
+            if not future.done():
+                future.set_result(result)
 
-        return final_result
+    def _infer(self, inputs: list[tuple[np.ndarray, np.ndarray]], padded_h: int, padded_w: int) -> list[np.ndarray]:
+        """Load the model if needed and run one batch (called in a worker thread)."""
+        self._inpainter._load_model()
+        return self._inpainter._run_batch(inputs, padded_h, padded_w)
 
 
 # Global singleton instance
@@ -128,6 +482,44 @@ def get_inpainter() -> LaMaInpainter:
     return _inpainter
 
 
+_batcher: InpaintBatcher | None = None
+
+
+def get_batcher() -> InpaintBatcher:
+    """Get the singleton InpaintBatcher instance."""
+    global _batcher
+    if _batcher is None:
+        _batcher = InpaintBatcher(get_inpainter())
+    return _batcher
+
+
+def warm_up_inpainter() -> None:
+    """
+    Load the model and run a small inpainting pass.
+
+    Called at application startup so the first request does not pay for
+    the model download, load and JIT specialization.
+    """
+    image = np.zeros((64, 64, 3), dtype=np.uint8)
+    mask = np.zeros((64, 64), dtype=np.uint8)
+    mask[16:48, 16:48] = 255
+    get_inpainter().inpaint(image, mask)
+
+
+def _to_numpy(image: Image.Image, mask: Image.Image) -> tuple[np.ndarray, np.ndarray]:
+    """Convert an image and mask to arrays, resizing the mask to the image if needed."""
+    image_np = image_to_numpy(image)
+    mask_np = mask_to_numpy(mask)
+
+    # Resize mask to match image if needed
+    if mask_np.shape[:2] != image_np.shape[:2]:
+        mask_pil = Image.fromarray(mask_np)
+        mask_pil = mask_pil.resize((image_np.shape[1], image_np.shape[0]), Image.NEAREST)
+        mask_np = np.asarray(mask_pil)
+
+    return image_np, mask_np
+
+
 def inpaint_image(image: Image.Image, mask: Image.Image) -> Image.Image:
     """
     High-level function to inpaint an image.
@@ -139,22 +531,22 @@ def inpaint_image(image: Image.Image, mask: Image.Image) -> Image.Image:
     Returns:
         Inpainted PIL Image
     """
-    from app.utils.image_utils import image_to_numpy, mask_to_numpy, numpy_to_image
-
     inpainter = get_inpainter()
 
     # Convert to numpy
-    image_np = image_to_numpy(image)
-    mask_np = mask_to_numpy(mask)
-
-    # Resize mask to match image if needed
-    if mask_np.shape[:2] != image_np.shape[:2]:
-        mask_pil = Image.fromarray(mask_np)
-        mask_pil = mask_pil.resize((image_np.shape[1], image_np.shape[0]), Image.NEAREST)
-        mask_np = np.array(mask_pil)
+    image_np, mask_np = _to_numpy(image, mask)
 
     # Perform inpainting
     result_np = inpainter.inpaint(image_np, mask_np)
 
     # Convert back to PIL
     return numpy_to_image(result_np)
+
+
+async def inpaint_image_batched(image: Image.Image, mask: Image.Image) -> Image.Image:
+    """
+    Same as inpaint_image, but batches the model call with concurrent requests.
+    """
+    image_np, mask_np = _to_numpy(image, mask)
+    result_np = await get_batcher().inpaint(image_np, mask_np)
+    return numpy_to_image(result_np)
@@ -9,7 +9,9 @@ export function ResultDisplay() {
 
     const link = document.createElement('a');
     link.href = resultImage;
-    link.download = `inpainted-${Date.now()}.png`;
+    // The API returns WebP by default; name the file after the data URL's type
+    const extension = resultImage.slice('data:image/'.length, resultImage.indexOf(';'));
+    link.download = `inpainted-${Date.now()}.${extension}`;
     document.body.appendChild(link);
     link.click();
     document.body.removeChild(link);